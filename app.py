@@ -3,11 +3,24 @@ import logging
 from flask import Flask
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_wtf.csrf import CSRFProtect
+from jinja2 import FileSystemBytecodeCache
+from fragments import FragmentCacheExtension
 
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 
+# Share compiled templates between workers and restarts, and enable {% cache %} fragments.
+# This must run before CSRFProtect, which creates app.jinja_env from these options.
+jinja_cache_dir = os.environ.get("JINJA_CACHE_DIR")
+if jinja_cache_dir:
+    os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_options = dict(
+    app.jinja_options,
+    bytecode_cache=FileSystemBytecodeCache(jinja_cache_dir),
+    extensions=[FragmentCacheExtension],
+)
+
 # Enable CSRF protection
 csrf = CSRFProtect(app)
 
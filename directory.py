@@ -0,0 +1,65 @@
+import bisect
+import threading
+
+# Freelancer rankings and category facets, updated as portfolios and proposals change
+class FreelancerDirectory:
+    def __init__(self):
+        self.stats = {}  # freelancer_id -> {'categories': {category: count}, 'portfolio_size': n, 'accepted': n}
+        self.facets = {}  # category -> number of freelancers with work in it
+        self.rankings = {None: []}  # category (None for all) -> sorted rank keys
+        self.lock = threading.Lock()
+    
+    def rank_key(self, freelancer_id):
+        stats = self.stats[freelancer_id]
+        return (-stats['accepted'], -stats['portfolio_size'], freelancer_id)
+    
+    def add_freelancer(self, freelancer_id):
+        with self.lock:
+            if freelancer_id in self.stats:
+                return
+            self.stats[freelancer_id] = {'categories': {}, 'portfolio_size': 0, 'accepted': 0}
+            bisect.insort(self.rankings[None], self.rank_key(freelancer_id))
+    
+    def add_portfolio_item(self, freelancer_id, category):
+        self.add_freelancer(freelancer_id)
+        with self.lock:
+            stats = self.stats[freelancer_id]
+            self._unrank(freelancer_id)
+            stats['portfolio_size'] += 1
+            if category not in stats['categories']:
+                stats['categories'][category] = 0
+                self.facets[category] = self.facets.get(category, 0) + 1
+            stats['categories'][category] += 1
+            self._rank(freelancer_id)
+    
+    def add_accepted(self, freelancer_id, delta=1):
+        self.add_freelancer(freelancer_id)
+        with self.lock:
+            self._unrank(freelancer_id)
+            self.stats[freelancer_id]['accepted'] += delta
+            self._rank(freelancer_id)
+    
+    def page(self, category=None, cursor=None, limit=20):
+        # Returns up to `limit` freelancer ids ranked after `cursor`, plus the next cursor
+        with self.lock:
+            ranking = self.rankings.get(category, [])
+            start = bisect.bisect_right(ranking, cursor) if cursor else 0
+            keys = ranking[start:start + limit]
+            next_cursor = keys[-1] if start + limit < len(ranking) else None
+        return [key[2] for key in keys], next_cursor
+    
+    def _rankings_for(self, freelancer_id):
+        return [self.rankings[None]] + [self.rankings.setdefault(category, [])
+                                        for category in self.stats[freelancer_id]['categories']]
+    
+    def _unrank(self, freelancer_id):
+        key = self.rank_key(freelancer_id)
+        for ranking in self._rankings_for(freelancer_id):
+            index = bisect.bisect_left(ranking, key)
+            if index < len(ranking) and ranking[index] == key:
+                del ranking[index]
+    
+    def _rank(self, freelancer_id):
+        key = self.rank_key(freelancer_id)
+        for ranking in self._rankings_for(freelancer_id):
+            bisect.insort(ranking, key)
@@ -0,0 +1,38 @@
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+# Rendered fragments keyed by tag location and the (model, id) of the entities they depend on
+fragment_cache = {}
+
+class FragmentCacheExtension(Extension):
+    """Cache a block of template output per entity version.
+
+    Usage: {% cache project %}...{% endcache %} or {% cache proposal, freelancer %}.
+    The block is re-rendered only when one of the entities' version changes.
+    Cached HTML is shared by every viewer, so the block must not use current_user,
+    CSRF tokens, or per-viewer controls such as the "submit proposal" button.
+    """
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        # Each tag gets its own entries, so different cards for one entity don't collide
+        fragment = nodes.Const(f"{parser.name}:{lineno}")
+        entities = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            entities.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_render_fragment', [fragment, nodes.List(entities)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, fragment, entities, caller):
+        key = (fragment,) + tuple((type(entity).__name__, entity.id) for entity in entities)
+        versions = tuple(entity.version for entity in entities)
+
+        cached = fragment_cache.get(key)
+        if cached and cached[0] == versions:
+            return cached[1]
+
+        html = caller()
+        fragment_cache[key] = (versions, html)
+        return html
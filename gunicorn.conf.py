@@ -0,0 +1,6 @@
+# Gunicorn loads this file automatically from the working directory
+
+def post_fork(server, worker):
+    # Each worker keeps its own in-memory store, so each runs its own expiry thread
+    from scheduler import start_scheduler
+    start_scheduler()
@@ -1,7 +1,12 @@
 import logging
+import os
 from app import app
 from routes import *
+from scheduler import start_scheduler
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
+    # Only the reloader child serves requests, so only it runs the expiry thread
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_scheduler()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,5 +1,8 @@
+import heapq
+import threading
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from directory import FreelancerDirectory
 
 # In-memory database using dictionaries
 class Database:
@@ -14,10 +17,39 @@ class Database:
         self.proposal_id_counter = 1
         self.message_id_counter = 1
         self.portfolio_id_counter = 1
+        # Derived indexes
+        self.project_proposals = {}  # project_id -> list of proposal ids
+        self.deadline_heap = []  # (deadline, project_id) min-heap of open projects
+        self.deadline_lock = threading.Lock()
+        self.directory = FreelancerDirectory()
 
 db = Database()
 
-class User:
+# Request-scoped loader that coalesces id lookups into one get_many call per model
+class BatchLoader:
+    def __init__(self):
+        self.cache = {}
+    
+    def load_many(self, model, ids):
+        cache = self.cache.setdefault(model, {})
+        missing = [obj_id for obj_id in ids if obj_id not in cache]
+        if missing:
+            found = model.get_many(missing)
+            for obj_id in missing:
+                cache[obj_id] = found.get(obj_id)
+        return {obj_id: cache[obj_id] for obj_id in ids}
+    
+    def load(self, model, obj_id):
+        return self.load_many(model, [obj_id])[obj_id]
+
+# Any attribute change bumps the version so cached {% cache %} fragments are invalidated
+class Versioned:
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != 'version':
+            super().__setattr__('version', getattr(self, 'version', 0) + 1)
+
+class User(Versioned):
     def __init__(self, username, email, password, user_type):
         self.id = db.user_id_counter
         db.user_id_counter += 1
@@ -28,6 +60,8 @@ class User:
         self.created_at = datetime.now()
         # Add user to the database
         db.users[self.id] = self
+        if user_type == 'freelancer':
+            db.directory.add_freelancer(self.id)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -36,6 +70,11 @@ class User:
     def get_by_id(cls, user_id):
         return db.users.get(user_id)
     
+    @classmethod
+    def get_many(cls, user_ids):
+        users = db.users
+        return {user_id: users[user_id] for user_id in set(user_ids) if user_id in users}
+    
     @classmethod
     def get_by_email(cls, email):
         for user in db.users.values():
@@ -50,7 +89,7 @@ class User:
                 return user
         return None
 
-class Project:
+class Project(Versioned):
     def __init__(self, title, description, budget, deadline, category, client_id):
         self.id = db.project_id_counter
         db.project_id_counter += 1
@@ -60,15 +99,24 @@ class Project:
         self.deadline = deadline
         self.category = category
         self.client_id = client_id
-        self.status = 'open'  # open, in_progress, completed, cancelled
+        self.status = 'open'  # open, in_progress, completed, cancelled, expired
         self.created_at = datetime.now()
         # Add project to the database
         db.projects[self.id] = self
+        # Schedule the project for expiry once its deadline passes
+        if deadline is not None:
+            with db.deadline_lock:
+                heapq.heappush(db.deadline_heap, (deadline, self.id))
     
     @classmethod
     def get_by_id(cls, project_id):
         return db.projects.get(project_id)
     
+    @classmethod
+    def get_many(cls, project_ids):
+        projects = db.projects
+        return {project_id: projects[project_id] for project_id in set(project_ids) if project_id in projects}
+    
     @classmethod
     def get_by_client(cls, client_id):
         return [project for project in db.projects.values() if project.client_id == client_id]
@@ -81,7 +129,7 @@ class Project:
     def get_by_category(cls, category):
         return [project for project in db.projects.values() if project.category == category]
 
-class Proposal:
+class Proposal(Versioned):
     def __init__(self, project_id, freelancer_id, cover_letter, price, delivery_time):
         self.id = db.proposal_id_counter
         db.proposal_id_counter += 1
@@ -94,14 +142,27 @@ class Proposal:
         self.created_at = datetime.now()
         # Add proposal to the database
         db.proposals[self.id] = self
+        db.project_proposals.setdefault(project_id, []).append(self.id)
+    
+    def __setattr__(self, name, value):
+        was_accepted = name == 'status' and getattr(self, 'status', None) == 'accepted'
+        super().__setattr__(name, value)
+        # Keep the freelancer directory's accepted counts in sync with status changes
+        if name == 'status' and was_accepted != (value == 'accepted'):
+            db.directory.add_accepted(self.freelancer_id, 1 if value == 'accepted' else -1)
     
     @classmethod
     def get_by_id(cls, proposal_id):
         return db.proposals.get(proposal_id)
     
+    @classmethod
+    def get_many(cls, proposal_ids):
+        proposals = db.proposals
+        return {proposal_id: proposals[proposal_id] for proposal_id in set(proposal_ids) if proposal_id in proposals}
+    
     @classmethod
     def get_by_project(cls, project_id):
-        return [proposal for proposal in db.proposals.values() if proposal.project_id == project_id]
+        return [db.proposals[proposal_id] for proposal_id in db.project_proposals.get(project_id, [])]
     
     @classmethod
     def get_by_freelancer(cls, freelancer_id):
@@ -141,7 +202,7 @@ class Message:
         return [message for message in db.messages.values() 
                if message.sender_id == user_id or message.receiver_id == user_id]
 
-class PortfolioItem:
+class PortfolioItem(Versioned):
     def __init__(self, freelancer_id, title, description, image_url, category):
         self.id = db.portfolio_id_counter
         db.portfolio_id_counter += 1
@@ -153,6 +214,7 @@ class PortfolioItem:
         self.created_at = datetime.now()
         # Add portfolio item to the database
         db.portfolios[self.id] = self
+        db.directory.add_portfolio_item(freelancer_id, category)
     
     @classmethod
     def get_by_id(cls, portfolio_id):
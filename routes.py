@@ -1,14 +1,20 @@
 import os
 from datetime import datetime
-from flask import render_template, redirect, url_for, request, flash, session, abort
+from flask import render_template, redirect, url_for, request, flash, session, abort, g
 from app import app
-from models import User, Project, Proposal, Message, PortfolioItem, CATEGORIES
+from models import db, User, Project, Proposal, Message, PortfolioItem, BatchLoader, CATEGORIES
 from forms import LoginForm, RegisterForm, ProjectForm, ProposalForm, MessageForm, PortfolioItemForm
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Utility functions
+def get_loader():
+    # One loader per request so repeated id lookups hit the memoized results
+    if 'loader' not in g:
+        g.loader = BatchLoader()
+    return g.loader
+
 def login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
@@ -24,7 +30,7 @@ def client_required(f):
             flash('Please login to access this page', 'warning')
             return redirect(url_for('login', next=request.url))
         
-        user = User.get_by_id(session['user_id'])
+        user = get_loader().load(User, session['user_id'])
         if not user or user.user_type != 'client':
             flash('Access denied. Client privileges required.', 'danger')
             return redirect(url_for('index'))
@@ -38,7 +44,7 @@ def freelancer_required(f):
             flash('Please login to access this page', 'warning')
             return redirect(url_for('login', next=request.url))
         
-        user = User.get_by_id(session['user_id'])
+        user = get_loader().load(User, session['user_id'])
         if not user or user.user_type != 'freelancer':
             flash('Access denied. Freelancer privileges required.', 'danger')
             return redirect(url_for('index'))
@@ -51,7 +57,7 @@ def freelancer_required(f):
 def inject_user():
     user = None
     if 'user_id' in session:
-        user = User.get_by_id(session['user_id'])
+        user = get_loader().load(User, session['user_id'])
     return dict(current_user=user)
 
 @app.route('/')
@@ -118,7 +124,7 @@ def logout():
 @client_required
 def client_dashboard():
     user_id = session['user_id']
-    user = User.get_by_id(user_id)
+    user = get_loader().load(User, user_id)
     projects = Project.get_by_client(user_id)
     
     return render_template('client/dashboard.html', user=user, projects=projects)
@@ -154,7 +160,7 @@ def view_proposals(project_id):
         return redirect(url_for('client_dashboard'))
     
     proposals = Proposal.get_by_project(project_id)
-    freelancers = {proposal.freelancer_id: User.get_by_id(proposal.freelancer_id) for proposal in proposals}
+    freelancers = get_loader().load_many(User, [proposal.freelancer_id for proposal in proposals])
     
     return render_template('client/view_proposals.html', project=project, proposals=proposals, freelancers=freelancers)
 
@@ -169,25 +175,56 @@ def client_messages():
     for message in messages:
         other_id = message.sender_id if message.sender_id != user_id else message.receiver_id
         if other_id not in conversations:
-            conversations[other_id] = {
-                'user': User.get_by_id(other_id),
-                'last_message': message
-            }
+            conversations[other_id] = {'last_message': message}
+    
+    partners = get_loader().load_many(User, list(conversations))
+    for other_id, entry in conversations.items():
+        entry['user'] = partners[other_id]
     
     form = MessageForm()
     return render_template('client/messages.html', conversations=conversations, form=form)
 
+@app.route('/client/freelancers')
+@client_required
+def freelancer_directory():
+    category = request.args.get('category', '')
+    if category not in CATEGORIES:
+        category = ''
+    
+    # Cursor is "<accepted>.<portfolio size>.<freelancer id>" of the last freelancer shown
+    cursor = None
+    if request.args.get('cursor'):
+        try:
+            accepted, portfolio_size, freelancer_id = map(int, request.args['cursor'].split('.'))
+        except ValueError:
+            abort(400)
+        cursor = (-accepted, -portfolio_size, freelancer_id)
+    
+    directory = db.directory
+    freelancer_ids, next_key = directory.page(category or None, cursor)
+    freelancers = get_loader().load_many(User, freelancer_ids)
+    next_cursor = f"{-next_key[0]}.{-next_key[1]}.{next_key[2]}" if next_key else None
+    facets = {cat: directory.facets.get(cat, 0) for cat in CATEGORIES}
+    
+    return render_template('client/freelancers.html',
+                          freelancers=[freelancers[freelancer_id] for freelancer_id in freelancer_ids],
+                          stats=directory.stats,
+                          facets=facets,
+                          categories=CATEGORIES,
+                          selected_category=category,
+                          next_cursor=next_cursor)
+
 # Freelancer Routes
 @app.route('/freelancer/dashboard')
 @freelancer_required
 def freelancer_dashboard():
     user_id = session['user_id']
-    user = User.get_by_id(user_id)
+    user = get_loader().load(User, user_id)
     proposals = Proposal.get_by_freelancer(user_id)
     portfolio_items = PortfolioItem.get_by_freelancer(user_id)
     
     # Get projects from proposals
-    projects = {proposal.project_id: Project.get_by_id(proposal.project_id) for proposal in proposals}
+    projects = get_loader().load_many(Project, [proposal.project_id for proposal in proposals])
     
     return render_template('freelancer/dashboard.html', 
                           user=user, 
@@ -255,13 +292,19 @@ def submit_proposal(project_id):
     form.project_id.data = project_id
     
     if form.validate_on_submit():
-        proposal = Proposal(
-            project_id=project_id,
-            freelancer_id=user_id,
-            cover_letter=form.cover_letter.data,
-            price=form.price.data,
-            delivery_time=form.delivery_time.data
-        )
+        # Hold the expiry lock so the project cannot expire between the check and the insert
+        with db.deadline_lock:
+            if project.status != 'open':
+                flash('Project not found or not open for proposals.', 'danger')
+                return redirect(url_for('browse_projects'))
+            
+            proposal = Proposal(
+                project_id=project_id,
+                freelancer_id=user_id,
+                cover_letter=form.cover_letter.data,
+                price=form.price.data,
+                delivery_time=form.delivery_time.data
+            )
         
         flash('Your proposal has been submitted successfully!', 'success')
         return redirect(url_for('freelancer_dashboard'))
@@ -279,10 +322,11 @@ def freelancer_messages():
     for message in messages:
         other_id = message.sender_id if message.sender_id != user_id else message.receiver_id
         if other_id not in conversations:
-            conversations[other_id] = {
-                'user': User.get_by_id(other_id),
-                'last_message': message
-            }
+            conversations[other_id] = {'last_message': message}
+    
+    partners = get_loader().load_many(User, list(conversations))
+    for other_id, entry in conversations.items():
+        entry['user'] = partners[other_id]
     
     form = MessageForm()
     return render_template('freelancer/messages.html', conversations=conversations, form=form)
@@ -296,9 +340,10 @@ def view_project(project_id):
         flash('Project not found.', 'danger')
         return redirect(url_for('index'))
     
-    client = User.get_by_id(project.client_id)
     user_id = session['user_id']
-    user = User.get_by_id(user_id)
+    users = get_loader().load_many(User, [project.client_id, user_id])
+    client = users[project.client_id]
+    user = users[user_id]
     
     # If the user is a freelancer, show the proposal form
     proposal_form = None
@@ -316,7 +361,7 @@ def view_project(project_id):
     freelancers = {}
     if user.user_type == 'client' and project.client_id == user_id:
         proposals = Proposal.get_by_project(project_id)
-        freelancers = {p.freelancer_id: User.get_by_id(p.freelancer_id) for p in proposals}
+        freelancers = get_loader().load_many(User, [p.freelancer_id for p in proposals])
     
     return render_template('project/view.html', 
                           project=project, 
@@ -406,15 +451,21 @@ def accept_proposal(proposal_id):
         flash('Access denied or project not found.', 'danger')
         return redirect(url_for('client_dashboard'))
     
-    # Update proposal and project status
-    proposal.status = 'accepted'
-    project.status = 'in_progress'
-    
-    # Reject all other proposals for this project
-    other_proposals = Proposal.get_by_project(project.id)
-    for p in other_proposals:
-        if p.id != proposal_id:
-            p.status = 'rejected'
+    # Hold the expiry lock so the scheduler cannot expire the project mid-update
+    with db.deadline_lock:
+        if project.status == 'expired':
+            flash('This project has passed its deadline.', 'danger')
+            return redirect(url_for('view_proposals', project_id=project.id))
+        
+        # Update proposal and project status
+        proposal.status = 'accepted'
+        project.status = 'in_progress'
+        
+        # Reject all other proposals for this project
+        other_proposals = Proposal.get_by_project(project.id)
+        for p in other_proposals:
+            if p.id != proposal_id:
+                p.status = 'rejected'
     
     flash('Proposal accepted! The project is now in progress.', 'success')
     return redirect(url_for('view_proposals', project_id=project.id))
@@ -0,0 +1,54 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from datetime import date
+from models import db, Project, Proposal
+
+logger = logging.getLogger(__name__)
+
+scheduler_thread = None
+scheduler_lock = threading.Lock()
+
+# Expire open projects whose deadline has passed
+def expire_projects(today=None):
+    today = today or date.today()
+    expired = []
+
+    # Request handlers take the same lock before moving a project out of 'open'
+    with db.deadline_lock:
+        while db.deadline_heap and db.deadline_heap[0][0] < today:
+            deadline, project_id = heapq.heappop(db.deadline_heap)
+            project = Project.get_by_id(project_id)
+            # Skip stale entries for projects that were accepted, cancelled or rescheduled
+            if not project or project.status != 'open' or project.deadline != deadline:
+                continue
+
+            project.status = 'expired'
+            for proposal in Proposal.get_by_project(project_id):
+                if proposal.status == 'pending':
+                    proposal.status = 'rejected'
+            expired.append(project)
+
+    if expired:
+        logger.info(f"Expired {len(expired)} project(s) past their deadline")
+    return expired
+
+def run_scheduler(interval):
+    while True:
+        try:
+            expire_projects()
+        except Exception:
+            logger.exception("Project expiry tick failed")
+        time.sleep(interval)
+
+# Start the expiry thread for this process; later calls return the running thread
+def start_scheduler(interval=None):
+    global scheduler_thread
+    with scheduler_lock:
+        if scheduler_thread is None:
+            interval = interval or int(os.environ.get("EXPIRY_INTERVAL", "60"))
+            scheduler_thread = threading.Thread(target=run_scheduler, args=(interval,), name="project-expiry", daemon=True)
+            scheduler_thread.start()
+    return scheduler_thread